@@ -17,16 +17,33 @@ class Settings(BaseSettings):
     # Detection
     DETECTION_THRESHOLD: float = 0.15
 
+    # Inference
+    USE_FP16: bool = True  # YOLO half precision on CUDA only
+    USE_TENSORRT: bool = True  # export/load a TensorRT engine on CUDA
+    USE_ONNX_CPU: bool = True  # export/load an ONNX Runtime model on CPU
+    INT8_CALIBRATION_DATA: str = ""  # dataset YAML; enables a TensorRT INT8 engine
+
     # OCR
     OCR_LANG: str = "en"
     OCR_USE_ANGLE_CLS: bool = True
+    OCR_REC_BATCH_NUM: int = 16
+    OCR_DROP_SCORE: float = 0.5
 
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WORKERS: int = 1  # each worker process loads its own models
+    BACKLOG: int = 512
+    LIMIT_CONCURRENCY: int | None = 64
+    KEEP_ALIVE_TIMEOUT: int = 30
 
     # Upload limits
     MAX_FILE_SIZE_MB: int = 10
+    MAX_IMAGE_DIMENSION: int = 1280  # larger uploads are downscaled
+
+    # Cache
+    OCR_CACHE_SIZE: int = 256  # repeat uploads skip detection + OCR; 0 disables
+    OCR_CACHE_TTL_SECONDS: int = 60
 
     class Config:
         env_file = ".env"
@@ -14,16 +14,8 @@ class CNICData(BaseModel):
     date_of_expiry: Optional[str] = None
 
 
-class CNICDataClean(BaseModel):
-    """Clean CNIC data with essential fields."""
-    name: Optional[str] = None
-    father_name: Optional[str] = None
-    gender: Optional[str] = None
-    country_of_stay: Optional[str] = None
-    identity_number: Optional[str] = None
-    date_of_birth: Optional[str] = None
-    date_of_issue: Optional[str] = None
-    date_of_expiry: Optional[str] = None
+# The clean endpoint returns the same fields; kept as an alias for existing imports
+CNICDataClean = CNICData
 
 
 class DetectionInfo(BaseModel):
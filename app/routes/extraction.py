@@ -4,7 +4,6 @@ from fastapi import APIRouter, File, HTTPException, UploadFile
 
 from app.models.schemas import (
     CNICData,
-    CNICDataClean,
     DetectionInfo,
     ExtractionResponse,
     CleanExtractionResponse,
@@ -12,7 +11,8 @@ from app.models.schemas import (
 )
 from app.services.detector import detector
 from app.services.ocr import ocr_service
-from app.utils.image import read_image_from_upload, validate_image_file
+from app.services.pipeline import pipeline
+from app.utils.image import validate_image_file
 from app.utils.parser import parse_cnic_fields
 from app.utils.parser_v2 import cnic_parser
 from app.config import settings
@@ -38,13 +38,10 @@ async def extract_cnic(
         # Validate file type
         validate_image_file(file)
 
-        # Read image
-        image = await read_image_from_upload(file)
+        # Detect text regions and run OCR on each (cached by image content)
+        raw_texts, regions = await pipeline.run(file, threshold)
 
-        # Detect text regions
-        cropped_images = detector.detect_and_crop(image, threshold=threshold)
-
-        if not cropped_images:
+        if not regions:
             return ExtractionResponse(
                 success=False,
                 message="No text regions detected in the image. "
@@ -55,14 +52,12 @@ async def extract_cnic(
                 ),
             )
 
-        # Run OCR on each cropped region
-        raw_texts = ocr_service.extract_texts_batch(cropped_images)
-        logger.info(f"Raw OCR texts: {raw_texts}")
+        logger.debug("Raw OCR texts: %s", raw_texts)
 
         # Parse into structured fields (optional)
         if parse:
             cnic_data = parse_cnic_fields(raw_texts)
-            logger.info(f"Parsed CNIC data: {cnic_data.model_dump()}")
+            logger.debug("Parsed CNIC data: %s", cnic_data)
         else:
             cnic_data = None
 
@@ -72,7 +67,7 @@ async def extract_cnic(
             data=cnic_data,
             raw_texts=raw_texts,
             detection_info=DetectionInfo(
-                total_regions_detected=len(cropped_images),
+                total_regions_detected=regions,
                 detection_threshold=threshold or settings.DETECTION_THRESHOLD,
             ),
         )
@@ -94,18 +89,15 @@ async def extract_raw_text(
     """Extract and return only raw OCR text without parsing."""
     try:
         validate_image_file(file)
-        image = await read_image_from_upload(file)
-        cropped_images = detector.detect_and_crop(image, threshold=threshold)
+        raw_texts, regions = await pipeline.run(file, threshold)
         
-        if not cropped_images:
+        if not regions:
             return {"success": False, "raw_texts": [], "message": "No text regions detected"}
         
-        raw_texts = ocr_service.extract_texts_batch(cropped_images)
-        
         return {
             "success": True,
             "raw_texts": raw_texts,
-            "total_regions": len(cropped_images)
+            "total_regions": regions
         }
     except Exception as e:
         logger.exception("Error extracting raw text")
@@ -128,22 +120,17 @@ async def extract_cnic_json(
         # Validate file type
         validate_image_file(file)
 
-        # Read image
-        image = await read_image_from_upload(file)
-
-        # Detect text regions
-        cropped_images = detector.detect_and_crop(image, threshold=threshold)
+        # Detect text regions and run OCR on each (cached by image content)
+        raw_texts, regions = await pipeline.run(file, threshold)
 
-        if not cropped_images:
+        if not regions:
             return CleanExtractionResponse(
                 success=False,
                 message="No text regions detected. Ensure the image contains a clear CNIC.",
                 data=None,
             )
 
-        # Run OCR on each cropped region
-        raw_texts = ocr_service.extract_texts_batch(cropped_images)
-        logger.info(f"Raw OCR texts: {raw_texts}")
+        logger.debug("Raw OCR texts: %s", raw_texts)
 
         # Parse with improved parser (returns data and optional error)
         parsed_data, validation_error = cnic_parser.parse(raw_texts)
@@ -156,9 +143,9 @@ async def extract_cnic_json(
                 data=None,
             )
         
-        cnic_data_clean = CNICDataClean(**parsed_data)
+        cnic_data_clean = CNICData(**parsed_data)
         
-        logger.info(f"Parsed CNIC data: {parsed_data}")
+        logger.debug("Parsed CNIC data: %s", parsed_data)
 
         return CleanExtractionResponse(
             success=True,
@@ -0,0 +1,57 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OCRResultCache:
+    """Thread-safe LRU cache of OCR results with a per-entry time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, list[str], int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> tuple[list[str], int] | None:
+        """
+        Look up cached OCR output.
+
+        Args:
+            key: Cache key, e.g. (content hash, detection threshold).
+
+        Returns:
+            Tuple of (raw_texts copy, regions detected), or None on a miss
+            or if the entry has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, raw_texts, regions = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+        return list(raw_texts), regions
+
+    def put(self, key: Hashable, raw_texts: list[str], regions: int) -> None:
+        """Store OCR output, evicting the least recently used entry if full."""
+        if self._maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, list(raw_texts), regions)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+
+# Singleton instance
+ocr_cache = OCRResultCache(maxsize=settings.OCR_CACHE_SIZE, ttl=settings.OCR_CACHE_TTL_SECONDS)
@@ -1,7 +1,16 @@
 import cv2
+import json
 import logging
+import shutil
+import tempfile
+from pathlib import Path
+
 import numpy as np
+import torch
 from ultralytics import YOLO
+from ultralytics.data.augment import LetterBox
+from ultralytics.utils.nms import non_max_suppression
+from ultralytics.utils.ops import scale_boxes
 
 from app.config import MODEL_PATH, settings
 
@@ -14,6 +23,14 @@ class DetectionService:
     def __init__(self):
         self._model: YOLO | None = None
         self._device: str = "cuda" if self._is_cuda_available() else "cpu"
+        self._half: bool = self._device == "cuda" and settings.USE_FP16
+        self._imgsz: int = 640
+        self._letterbox = LetterBox(new_shape=(self._imgsz, self._imgsz), auto=False)
+        # CUDA staging buffers (pinned host + persistent device), see load_model
+        self._host_buffer: torch.Tensor | None = None
+        self._device_buffer: torch.Tensor | None = None
+        self._device_input: torch.Tensor | None = None
+        self._predictor = None
 
     @staticmethod
     def _is_cuda_available() -> bool:
@@ -26,10 +43,178 @@ class DetectionService:
 
     def load_model(self) -> None:
         """Load the YOLO model into memory."""
-        self._model = YOLO(str(MODEL_PATH))
-        # Force model to use GPU if available
-        self._model.to(self._device)
-        logger.info(f"YOLO model loaded (device: {self._device})")
+        exported_path = None
+        if self._device == "cuda" and settings.USE_TENSORRT:
+            int8_engine_path = MODEL_PATH.with_name(f"{MODEL_PATH.stem}_int8.engine")
+            if settings.INT8_CALIBRATION_DATA:
+                # INT8 is only built from real calibration images (an
+                # Ultralytics dataset YAML); without them the exporter would
+                # silently calibrate on a downloaded coco8 set.
+                exported_path = self._get_exported_model(
+                    int8_engine_path,
+                    format="engine",
+                    int8=True,
+                    data=settings.INT8_CALIBRATION_DATA,
+                    dynamic=True,
+                    imgsz=self._imgsz,
+                    workspace=4,
+                    device=0,
+                )
+            elif int8_engine_path.exists():
+                # A prebuilt INT8 engine is used as-is; delete it to go back to FP16
+                exported_path = int8_engine_path
+
+            if exported_path is not None:
+                # INT8 engines keep a float32 input binding
+                self._half = False
+            else:
+                # dynamic=True builds an optimization profile up to imgsz, so
+                # letterboxed inputs of any aspect ratio reuse the same engine.
+                exported_path = self._get_exported_model(
+                    MODEL_PATH.with_suffix(".engine"),
+                    format="engine",
+                    half=self._half,
+                    dynamic=True,
+                    imgsz=self._imgsz,
+                    workspace=4,
+                    device=0,
+                )
+        elif self._device == "cpu" and settings.USE_ONNX_CPU:
+            # Ultralytics runs .onnx files through ONNX Runtime's CPU provider
+            exported_path = self._get_exported_model(
+                MODEL_PATH.with_suffix(".onnx"),
+                format="onnx",
+                opset=17,
+                simplify=True,
+                dynamic=True,
+                imgsz=self._imgsz,
+            )
+
+        if exported_path is not None:
+            try:
+                self._load_weights(exported_path, task="detect")
+            except Exception as e:
+                # Exports deserialize lazily, so an engine built for another
+                # TensorRT version or GPU (or a corrupt file) only fails here
+                logger.warning(f"Could not load {exported_path.name}, using PyTorch model: {e}")
+                exported_path = None
+                self._half = self._device == "cuda" and settings.USE_FP16
+
+        if exported_path is None:
+            self._load_weights(MODEL_PATH)
+
+        model_name = exported_path.name if exported_path is not None else MODEL_PATH.name
+        logger.info(f"YOLO model loaded: {model_name} (device: {self._device}, fp16: {self._half})")
+
+    def _load_weights(self, path: Path, task: str | None = None) -> None:
+        """
+        Load a YOLO checkpoint or export and run it once.
+
+        The first call is what actually deserializes an export and, on CUDA,
+        builds the predictor that detect_and_crop drives directly, so a model
+        that cannot run raises here rather than on the first request.
+
+        Args:
+            path: .pt checkpoint or exported model (.engine, .onnx).
+            task: YOLO task, required for exported models.
+        """
+        model = YOLO(str(path), task=task)
+        if path.suffix == ".pt":
+            # Force model to use GPU if available
+            model.to(self._device)
+
+        with torch.inference_mode():
+            model(
+                np.zeros((self._imgsz, self._imgsz, 3), dtype=np.uint8),
+                half=self._half,
+                verbose=False,
+            )
+        self._model = model
+
+        if self._device == "cuda":
+            # Uploads are staged as uint8 in page-locked memory so the copy runs
+            # at full PCIe bandwidth; normalization happens on the GPU.
+            shape = (1, 3, self._imgsz, self._imgsz)
+            self._host_buffer = torch.empty(shape, dtype=torch.uint8, pin_memory=True)
+            self._device_buffer = torch.empty(shape, dtype=torch.uint8, device=self._device)
+
+            # The first call built Ultralytics' predictor (AutoBackend, args);
+            # staged tensors then go straight to its model, see _forward.
+            self._predictor = self._model.predictor
+            # The backend's input binding decides the precision: TensorRT
+            # engines exported from best.pt take float32 even when built with
+            # half=True, and AutoBackend only ever casts inputs *to* half.
+            self._half = self._predictor.model.fp16
+            self._device_input = torch.empty(
+                shape,
+                dtype=torch.float16 if self._half else torch.float32,
+                device=self._device,
+            )
+
+    def _get_exported_model(self, exported_path: Path, **export_args) -> Path | None:
+        """
+        Return a model exported from the checkpoint, exporting it if needed.
+
+        The export is cached at ``exported_path`` (e.g. best.engine,
+        best.onnx) and rebuilt whenever the checkpoint is newer than it or the
+        sidecar ``<export>.json`` build info no longer matches (export
+        arguments, plus TensorRT version and GPU for engines). It is
+        built from a scratch copy of the checkpoint, since Ultralytics names
+        its outputs after the source file and would otherwise overwrite other
+        cached exports (an INT8 build writes best.engine before renaming).
+        Returns None if the export fails (e.g. TensorRT or ONNX tooling is not
+        installed), so the caller can fall back to the .pt model.
+
+        Args:
+            exported_path: Where the exported model is cached.
+            **export_args: Arguments for ``YOLO.export``; must include ``format``.
+        """
+        build_info = self._build_info(export_args)
+        info_path = exported_path.with_name(f"{exported_path.name}.json")
+        if (
+            exported_path.exists()
+            and exported_path.stat().st_mtime >= MODEL_PATH.stat().st_mtime
+            and self._read_build_info(info_path) == build_info
+        ):
+            return exported_path
+
+        export_format = export_args["format"]
+        logger.info(f"Exporting YOLO model to {exported_path.name} (one-time, may take a few minutes)...")
+        try:
+            with tempfile.TemporaryDirectory(dir=MODEL_PATH.parent) as scratch_dir:
+                checkpoint = Path(scratch_dir) / MODEL_PATH.name
+                shutil.copy2(MODEL_PATH, checkpoint)
+                exported = Path(YOLO(str(checkpoint)).export(**export_args))
+                exported.replace(exported_path)
+            info_path.write_text(json.dumps(build_info))
+        except Exception as e:
+            logger.warning(f"YOLO {export_format} export failed, using PyTorch model: {e}")
+            return None
+
+        return exported_path
+
+    @staticmethod
+    def _build_info(export_args: dict) -> dict:
+        """Describe everything a cached export depends on besides the checkpoint."""
+        info: dict = {"export_args": export_args}
+        if export_args["format"] == "engine":
+            # Serialized engines only load on the TensorRT version and GPU
+            # they were built with
+            try:
+                import tensorrt
+                info["tensorrt"] = tensorrt.__version__
+            except ImportError:
+                info["tensorrt"] = None
+            info["gpu"] = torch.cuda.get_device_name(0)
+        return info
+
+    @staticmethod
+    def _read_build_info(info_path: Path) -> dict | None:
+        """Read a sidecar written by _get_exported_model, or None if missing/unreadable."""
+        try:
+            return json.loads(info_path.read_text())
+        except (OSError, ValueError):
+            return None
 
     @property
     def is_loaded(self) -> bool:
@@ -48,23 +233,78 @@ class DetectionService:
             threshold: Confidence threshold (uses config default if None).
 
         Returns:
-            List of cropped image regions (numpy arrays).
+            List of cropped image regions as views into ``image`` (no pixel
+            data is copied).
         """
         if self._model is None:
             raise RuntimeError("Model not loaded. Call load_model() first.")
 
         threshold = threshold or settings.DETECTION_THRESHOLD
-        results = self._model(image)[0]
-
-        cropped_images: list[np.ndarray] = []
-        for x1, y1, x2, y2, score, class_id in results.boxes.data.tolist():
-            if score > threshold:
-                cropped = image[int(y1):int(y2), int(x1):int(x2)]
-                cropped_images.append(cropped)
-        
-        logger.info(f"Detected {len(cropped_images)} text regions with threshold {threshold}")
+        with torch.inference_mode():
+            if self._predictor is not None:
+                source = self._stage_on_device(image)
+                detections = self._forward(source)
+            else:
+                results = self._model(image, half=self._half, verbose=False)[0]
+                detections = results.boxes.data
+
+        # One device->host copy for all boxes, then filter/clip in NumPy
+        data = detections.cpu().numpy()
+        if self._predictor is not None:
+            # Boxes are in letterboxed coordinates; map back to the original image
+            data[:, :4] = scale_boxes(source.shape[2:], data[:, :4], image.shape)
+        boxes = data[data[:, 4] > threshold, :4].astype(np.int32)
+        height, width = image.shape[:2]
+        np.clip(boxes[:, 0::2], 0, width, out=boxes[:, 0::2])
+        np.clip(boxes[:, 1::2], 0, height, out=boxes[:, 1::2])
+
+        cropped_images: list[np.ndarray] = [
+            image[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes
+        ]
+
+        logger.info("Detected %d text regions with threshold %s", len(cropped_images), threshold)
         return cropped_images
 
+    def _stage_on_device(self, image: np.ndarray) -> torch.Tensor:
+        """
+        Letterbox an image and copy it into the persistent CUDA input tensor.
+
+        Args:
+            image: BGR image as numpy array.
+
+        Returns:
+            Normalized RGB tensor of shape (1, 3, imgsz, imgsz) on the GPU.
+        """
+        letterboxed = self._letterbox(image=image)
+        # HWC BGR -> CHW RGB, as Ultralytics expects for tensor inputs
+        chw = np.ascontiguousarray(letterboxed[..., ::-1].transpose(2, 0, 1))
+        self._host_buffer[0].copy_(torch.from_numpy(chw))
+        self._device_buffer.copy_(self._host_buffer, non_blocking=True)
+        return self._device_input.copy_(self._device_buffer).div_(255)
+
+    def _forward(self, tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Run the backend model and NMS directly, skipping Ultralytics' predictor pipeline.
+
+        NMS keeps Ultralytics' default confidence cut-off, exactly as a plain
+        model call does; detect_and_crop applies the detection threshold on top.
+
+        Args:
+            tensor: Preprocessed input from _stage_on_device.
+
+        Returns:
+            Tensor of shape (N, 6): x1, y1, x2, y2, score, class_id.
+        """
+        backend = self._predictor.model
+        preds = backend(tensor)
+        return non_max_suppression(
+            preds,
+            self._predictor.args.conf,
+            self._predictor.args.iou,
+            max_det=self._predictor.args.max_det,
+            end2end=getattr(backend, "end2end", False),
+        )[0]
+
 
 # Singleton instance
 detector = DetectionService()
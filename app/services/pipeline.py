@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple
+
+from fastapi import UploadFile
+
+from app.config import settings
+from app.services.cache import ocr_cache
+from app.services.detector import detector
+from app.services.ocr import ocr_service
+from app.utils.image import content_hash, decode_image, read_upload_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineResult(NamedTuple):
+    """Output of detection + OCR for one upload."""
+    raw_texts: list[str]
+    regions: int
+
+
+class ExtractionPipeline:
+    """Shared upload -> detection -> OCR pipeline used by all extraction endpoints."""
+
+    def __init__(self):
+        self._executor: ThreadPoolExecutor | None = None
+        self._decode_executor: ThreadPoolExecutor | None = None
+
+    def start(self) -> None:
+        """Create the inference and decode thread pools. Call from the app lifespan."""
+        # Decoding and inference run off the event loop so uploads and /health
+        # stay responsive. The models are shared singletons and not
+        # thread-safe, so a single inference worker runs one call at a time;
+        # decoding touches no shared state and can use every core.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self._decode_executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1, thread_name_prefix="decode"
+        )
+
+    def shutdown(self) -> None:
+        """Stop the inference and decode thread pools."""
+        for executor in (self._executor, self._decode_executor):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self._executor = None
+        self._decode_executor = None
+
+    async def run(self, file: UploadFile, threshold: float | None = None) -> PipelineResult:
+        """
+        Run detection + OCR on an upload, reusing cached results for repeat images.
+
+        Args:
+            file: FastAPI UploadFile object.
+            threshold: Detection confidence threshold (uses config default if None).
+
+        Returns:
+            PipelineResult with raw texts and regions detected.
+
+        Raises:
+            ValueError: If the file is too large or not a valid image.
+            RuntimeError: If the pipeline or models are not ready.
+        """
+        contents = await read_upload_bytes(file)
+        digest = content_hash(contents)
+        cache_key = (digest, threshold or settings.DETECTION_THRESHOLD)
+
+        cached = ocr_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("OCR cache hit for image %s", digest)
+            raw_texts, regions = cached
+            return PipelineResult(raw_texts, regions)
+
+        image = await self._run_in(self._decode_executor, decode_image, contents)
+        cropped_images = await self._run_in(self._executor, detector.detect_and_crop, image, threshold)
+        raw_texts = []
+        if cropped_images:
+            raw_texts = await self._run_in(self._executor, ocr_service.extract_texts_batch, cropped_images)
+
+        ocr_cache.put(cache_key, raw_texts, len(cropped_images))
+        return PipelineResult(raw_texts, len(cropped_images))
+
+    @staticmethod
+    async def _run_in(executor: ThreadPoolExecutor | None, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking call in one of the pipeline's thread pools."""
+        if executor is None:
+            raise RuntimeError("Pipeline not started. Call start() first.")
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, func, *args)
+
+
+# Singleton instance
+pipeline = ExtractionPipeline()
@@ -1,40 +1,154 @@
+import hashlib
+
 import cv2
 import numpy as np
 from fastapi import UploadFile
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    from turbojpeg import TJPF_BGR, TurboJPEG
+    _turbo_jpeg = TurboJPEG()
+except Exception:  # package missing or libturbojpeg not found
+    _turbo_jpeg = None
+
 from app.config import settings
 
+READ_CHUNK_SIZE = 64 * 1024
 
-async def read_image_from_upload(file: UploadFile) -> np.ndarray:
+
+async def read_upload_bytes(file: UploadFile) -> bytearray:
     """
-    Read an uploaded file and convert it to an OpenCV image (BGR).
+    Read an uploaded file's raw bytes, enforcing the size limit.
 
     Args:
         file: FastAPI UploadFile object.
 
     Returns:
-        Image as numpy array in BGR format.
+        File contents.
 
     Raises:
-        ValueError: If file is too large or not a valid image.
+        ValueError: If file is too large.
     """
-    contents = await file.read()
-
-    # Check file size
     max_bytes = settings.MAX_FILE_SIZE_MB * 1024 * 1024
-    if len(contents) > max_bytes:
+    size_error = f"File size exceeds {settings.MAX_FILE_SIZE_MB}MB limit."
+
+    # Reject early when the multipart parser already knows the size
+    if file.size is not None and file.size > max_bytes:
+        raise ValueError(size_error)
+
+    # Read in chunks so an oversized body is never held in memory in full
+    contents = bytearray()
+    while chunk := await file.read(READ_CHUNK_SIZE):
+        contents.extend(chunk)
+        if len(contents) > max_bytes:
+            raise ValueError(size_error)
+
+    return contents
+
+
+def decode_image(contents: bytes | bytearray) -> np.ndarray:
+    """
+    Decode raw image bytes to an OpenCV image (BGR), downscaled if oversized.
+
+    Args:
+        contents: Encoded image bytes.
+
+    Returns:
+        Image as numpy array in BGR format.
+
+    Raises:
+        ValueError: If the bytes are not a valid image.
+    """
+    image_type = detect_image_type(contents)
+    if image_type is None:
         raise ValueError(
-            f"File size exceeds {settings.MAX_FILE_SIZE_MB}MB limit."
+            "Unsupported or corrupt image file. Allowed: JPEG, PNG, BMP, WEBP."
         )
 
-    # Decode image
-    np_arr = np.frombuffer(contents, np.uint8)
-    image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+    image = None
+    if _turbo_jpeg is not None and image_type == "jpeg":
+        image = _decode_jpeg_turbo(contents)
+
+    if image is None:
+        # EXIF orientation is ignored to match the TurboJPEG path
+        np_arr = np.frombuffer(contents, np.uint8)
+        image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
 
     if image is None:
         raise ValueError("Could not decode image. Ensure it is a valid image file.")
 
-    return image
+    return downscale_image(image)
+
+
+def detect_image_type(contents: bytes | bytearray) -> str | None:
+    """
+    Identify a supported image format from its leading magic bytes.
+
+    Args:
+        contents: Encoded image bytes.
+
+    Returns:
+        One of "jpeg", "png", "bmp", "webp", or None if not recognized.
+    """
+    header = bytes(contents[:12])
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header.startswith(b"BM"):
+        return "bmp"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _decode_jpeg_turbo(contents: bytes | bytearray) -> np.ndarray | None:
+    """
+    Decode a JPEG with libjpeg-turbo, at half resolution when it will be downscaled anyway.
+
+    Returns None if TurboJPEG cannot decode the data, so the caller can fall
+    back to OpenCV.
+    """
+    try:
+        width, height, _, _ = _turbo_jpeg.decode_header(contents)
+        scaling_factor = (1, 2) if max(width, height) >= 2 * settings.MAX_IMAGE_DIMENSION else None
+        return _turbo_jpeg.decode(contents, pixel_format=TJPF_BGR, scaling_factor=scaling_factor)
+    except Exception:
+        return None
+
+
+def content_hash(contents: bytes | bytearray) -> str:
+    """Return a fast, non-cryptographic hex digest of the uploaded bytes."""
+    if xxhash is not None:
+        return xxhash.xxh3_64(contents).hexdigest()
+    return hashlib.blake2b(contents, digest_size=8).hexdigest()
+
+
+def downscale_image(image: np.ndarray, max_dim: int | None = None) -> np.ndarray:
+    """
+    Shrink an image so its longest side is at most ``max_dim`` pixels.
+
+    YOLO letterboxes to 640 px and the OCR recognizer resizes each crop to a
+    fixed height, so anything far above that only costs memory bandwidth.
+
+    Args:
+        image: Image as numpy array.
+        max_dim: Maximum side length (uses config default if None).
+
+    Returns:
+        The original image if already small enough, otherwise a resized copy.
+    """
+    max_dim = max_dim or settings.MAX_IMAGE_DIMENSION
+    height, width = image.shape[:2]
+    scale = max_dim / max(height, width)
+    if scale >= 1.0:
+        return image
+
+    return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
 
 
 def validate_image_file(file: UploadFile) -> None:
@@ -5,6 +5,65 @@ from app.models.schemas import CNICData
 
 logger = logging.getLogger(__name__)
 
+# Patterns are compiled once at import; the parser runs them for every OCR region.
+_CNIC_DASHED_RE = re.compile(r"\d{5}-\d{7}-\d")
+_GENDER_VALUE_RE = re.compile(r"\b([MF])\b")
+_GENDER_COMBINED_RE = re.compile(r"gender\s+([MF])\b", re.IGNORECASE)
+# (keyword, field, pattern) for each labelled date, in extraction order.
+_DATE_FIELD_PATTERNS = (
+    ("birth", "date_of_birth", re.compile(r"(?:date\s+of\s+)?birth[^\d]*(\d{2}[./-]\d{2}[./-]\d{4})", re.IGNORECASE)),
+    ("issue", "date_of_issue", re.compile(r"(?:date\s+of\s+)?issue[^\d]*(\d{2}[./-]\d{2}[./-]\d{4})", re.IGNORECASE)),
+    ("expiry", "date_of_expiry", re.compile(r"(?:date\s+of\s+)?expiry[^\d]*(\d{2}[./-]\d{2}[./-]\d{4})", re.IGNORECASE)),
+)
+_DATE_SEPARATORS = str.maketrans("-.", "//")
+_OCR_TYPOS = {"lssue": "issue", "Fathet": "Father", "fathet": "father"}
+_OCR_TYPO_RE = re.compile("|".join(_OCR_TYPOS))
+_LABELS = frozenset({
+    "pakistan", "national", "identity", "card", "islamic",
+    "republic", "holder", "signature", "holder's signature",
+    "name", "father", "fathers", "gender", "country", "date",
+    "birth", "issue", "expiry", "stay", "of", "the",
+})
+_MAX_LABEL_LENGTH = max(map(len, _LABELS))
+_COUNTRY_STAY_RE = re.compile(r"country\s+of\s+stay\s*:?\s*", re.IGNORECASE)
+_FATHER_LABEL_RE = re.compile(r"father'?s?\s+name\s*:?\s*", re.IGNORECASE)
+_FATHER_VALUE_RE = re.compile(r"father'?s?\s+name\s*:?\s+([A-Za-z ]{3,50})", re.IGNORECASE)
+_NAME_LABEL_COLON_RE = re.compile(r"name\s*:", re.IGNORECASE)
+_NAME_LABEL_RE = re.compile(r"^name\s*:?\s*", re.IGNORECASE)
+_NAME_VALUE_RE = re.compile(r"\bname\s+([A-Za-z ]+)", re.IGNORECASE)
+_NAME_CANDIDATE_RE = re.compile(r"^[A-Za-z ]{5,50}$")
+_OR_CLEAN_RE = re.compile(r"\s+Or\s+", re.IGNORECASE)
+_TAIL_NOISE_RE = re.compile(r"\s+(?:gender|country|date|identity|holder)", re.IGNORECASE)
+
+# Single-pass scan of a lowercased region: every value and keyword the field
+# extractors gate on is one named alternative, so finditer walks the string once.
+_REGION_TOKEN_RE = re.compile(
+    r"(?P<cnic>\d{5}-\d{7}-\d)"
+    r"|(?P<cnic13>\b\d{13}\b)"
+    r"|(?P<date>\d{2}[./-]\d{2}[./-]\d{4})"
+    r"|(?P<gender>\bgender\b)"
+    r"|(?P<birth>birth)"
+    r"|(?P<issue>issue)"
+    r"|(?P<expiry>expiry)"
+    r"|(?P<father>father)"
+    r"|(?P<country_stay>country of stay)"
+    r"|(?P<date_kw>date)"
+)
+# Label keywords that pull a neighbouring standalone value in the context pass.
+_CONTEXT_KEYWORD_RE = re.compile(r"birth|issue|expiry|father")
+# Keywords the combined-text patterns are anchored on, matched with the same
+# IGNORECASE semantics as those patterns. The lookahead makes every match
+# zero-width, so overlapping keywords (e.g. "issuexpiry") are all found.
+_COMBINED_KEYWORD_RE = re.compile(
+    r"(?=(?P<birth>birth)|(?P<issue>issue)|(?P<expiry>expiry)|(?P<father>father))",
+    re.IGNORECASE,
+)
+_CONTEXT_DATE_FIELDS = (
+    ("birth", "date_of_birth", "date of birth"),
+    ("issue", "date_of_issue", "date of issue"),
+    ("expiry", "date_of_expiry", "date of expiry"),
+)
+
 
 def parse_cnic_fields(raw_texts: list[str]) -> CNICData:
     """
@@ -19,8 +78,8 @@ def parse_cnic_fields(raw_texts: list[str]) -> CNICData:
     Returns:
         CNICData with populated fields.
     """
-    logger.info(f"Parsing {len(raw_texts)} OCR text regions")
-    logger.debug(f"Raw texts: {raw_texts}")
+    logger.info("Parsing %d OCR text regions", len(raw_texts))
+    logger.debug("Raw texts: %s", raw_texts)
     
     data: dict[str, str | None] = {
         "name": None,
@@ -33,36 +92,34 @@ def parse_cnic_fields(raw_texts: list[str]) -> CNICData:
         "date_of_expiry": None,
     }
 
-    # Combine all texts for full-text analysis as well
-    combined = " ".join(raw_texts)
-    
     # Track standalone dates and names for context-based matching
-    standalone_dates = []
+    standalone_dates = set()
     standalone_names = []
 
     for text in raw_texts:
         text_stripped = text.strip()
         text_lower = text_stripped.lower()
         
-        # Normalize common OCR typos
-        text_lower = text_lower.replace("lssue", "issue").replace("fathet", "father")
-        text_stripped = text_stripped.replace("lssue", "issue").replace("Fathet", "Father")
+        # Normalize common OCR typos; any cased variant also shows up in the
+        # lowercased copy, so clean regions skip the rewrite passes entirely
+        if "lssue" in text_lower or "fathet" in text_lower:
+            text_lower = _fix_ocr_typos(text_lower)
+            text_stripped = _fix_ocr_typos(text_stripped)
+
+        tokens = _scan_region(text_lower)
 
         # --- Identity Number (CNIC format: XXXXX-XXXXXXX-X) ---
-        cnic_match = re.search(r"\d{5}-\d{7}-\d", text_stripped)
-        if cnic_match:
-            data["identity_number"] = cnic_match.group()
+        if "cnic" in tokens:
+            data["identity_number"] = tokens["cnic"][0][1]
 
         # Also check for 13-digit number without dashes
-        if not data["identity_number"]:
-            cnic_nodash = re.search(r"\b\d{13}\b", text_stripped)
-            if cnic_nodash:
-                digits = cnic_nodash.group()
-                data["identity_number"] = f"{digits[:5]}-{digits[5:12]}-{digits[12]}"
+        if not data["identity_number"] and "cnic13" in tokens:
+            digits = tokens["cnic13"][0][1]
+            data["identity_number"] = f"{digits[:5]}-{digits[5:12]}-{digits[12]}"
 
         # --- Gender ---
-        if re.search(r"\bgender\b", text_lower):
-            gender_match = re.search(r"\b([MF])\b", text_stripped)
+        if "gender" in tokens:
+            gender_match = _GENDER_VALUE_RE.search(text_stripped)
             if gender_match:
                 data["gender"] = "Male" if gender_match.group(1) == "M" else "Female"
             elif "female" in text_lower:
@@ -71,32 +128,30 @@ def parse_cnic_fields(raw_texts: list[str]) -> CNICData:
                 data["gender"] = "Male"
 
         # --- Country of Stay ---
-        if "country of stay" in text_lower and not data["country_of_stay"]:
-            value = re.sub(r"(?i)country\s+of\s+stay\s*:?\s*", "", text_stripped).strip()
+        if "country_stay" in tokens and not data["country_of_stay"]:
+            value = _COUNTRY_STAY_RE.sub("", text_stripped).strip()
             if value and not _is_label_only(value):
                 data["country_of_stay"] = value.title()
 
         # --- Extract dates with context ---
         # Check if this is a multi-field line first (multiple dates/keywords)
-        has_multiple_dates = len(re.findall(r"\d{2}[./-]\d{2}[./-]\d{4}", text_stripped)) >= 2
-        has_multiple_keywords = text_lower.count("date") >= 2 or sum([
-            "birth" in text_lower,
-            "issue" in text_lower,
-            "expiry" in text_lower
+        date_tokens = tokens.get("date", ())
+        has_multiple_dates = len(date_tokens) >= 2
+        has_multiple_keywords = len(tokens.get("date_kw", ())) >= 2 or sum([
+            "birth" in tokens,
+            "issue" in tokens,
+            "expiry" in tokens
         ]) >= 2
         
         # Special handling for multi-field lines (all dates in one OCR line)
         # Example: "Identity Number Date of Birth 16202-0883647-3 24.08.1972 Date of Expiry Date of Issue 22.01.2021 22.01.2014"
         if has_multiple_dates and has_multiple_keywords:
-            # Extract all dates with their positions
-            all_dates_raw = re.findall(r"\d{2}[./-]\d{2}[./-]\d{4}", text_stripped)
-            all_dates = [d.replace("-", "/").replace(".", "/") for d in all_dates_raw]
-            
-            # Find positions of each date in the original text
-            date_positions = []
-            for date_raw in all_dates_raw:
-                pos = text_stripped.find(date_raw)
-                date_positions.append((pos, date_raw.replace("-", "/").replace(".", "/")))
+            # Positions come straight from the scan, so repeated dates keep
+            # their own offsets
+            date_positions = [
+                (pos, date_raw.translate(_DATE_SEPARATORS))
+                for pos, date_raw in date_tokens
+            ]
             
             # Find keyword positions
             keywords = [
@@ -107,8 +162,8 @@ def parse_cnic_fields(raw_texts: list[str]) -> CNICData:
             
             keyword_positions = []
             for keyword, field in keywords:
-                if keyword in text_lower and not data[field]:
-                    pos = text_lower.find(keyword)
+                if keyword in tokens and not data[field]:
+                    pos = tokens[keyword][0][0]
                     keyword_positions.append((pos, field))
             
             # Sort keywords by position
@@ -119,115 +174,157 @@ def parse_cnic_fields(raw_texts: list[str]) -> CNICData:
             for kw_pos, field in keyword_positions:
                 # Find the first date after this keyword that hasn't been used
                 for date_pos, date_val in date_positions:
-                    if date_pos > kw_pos and date_val not in used_dates:
+                    if date_pos > kw_pos and date_pos not in used_dates:
                         data[field] = date_val
-                        used_dates.add(date_val)
-                        logger.info(f"Extracted {field} from multi-field line: {date_val}")
+                        used_dates.add(date_pos)
+                        logger.info("Extracted %s from multi-field line: %s", field, date_val)
                         break
         
         # Handle single-field date lines (one keyword, one date)
         else:
-            if "birth" in text_lower and not data["date_of_birth"]:
-                birth_match = re.search(r"(?:date\s+of\s+)?birth[^\d]*(\d{2}[./-]\d{2}[./-]\d{4})", text_stripped, re.IGNORECASE)
-                if birth_match:
-                    data["date_of_birth"] = birth_match.group(1).replace("-", "/").replace(".", "/")
-                    logger.info(f"Extracted date_of_birth: {data['date_of_birth']}")
-            
-            if "issue" in text_lower and not data["date_of_issue"]:
-                issue_match = re.search(r"(?:date\s+of\s+)?issue[^\d]*(\d{2}[./-]\d{2}[./-]\d{4})", text_stripped, re.IGNORECASE)
-                if issue_match:
-                    data["date_of_issue"] = issue_match.group(1).replace("-", "/").replace(".", "/")
-                    logger.info(f"Extracted date_of_issue: {data['date_of_issue']}")
-            
-            if "expiry" in text_lower and not data["date_of_expiry"]:
-                expiry_match = re.search(r"(?:date\s+of\s+)?expiry[^\d]*(\d{2}[./-]\d{2}[./-]\d{4})", text_stripped, re.IGNORECASE)
-                if expiry_match:
-                    data["date_of_expiry"] = expiry_match.group(1).replace("-", "/").replace(".", "/")
-                    logger.info(f"Extracted date_of_expiry: {data['date_of_expiry']}")
+            for keyword, field, pattern in _DATE_FIELD_PATTERNS:
+                if keyword in tokens and not data[field]:
+                    match = pattern.search(text_stripped)
+                    if match:
+                        data[field] = match.group(1).translate(_DATE_SEPARATORS)
+                        logger.info("Extracted %s: %s", field, data[field])
         
         # Collect standalone dates for later context matching
-        if re.match(r"^\d{2}[./-]\d{2}[./-]\d{4}$", text_stripped.strip()):
-            normalized_date = text_stripped.strip().replace("-", "/").replace(".", "/")
-            standalone_dates.append(normalized_date)
+        if _is_standalone_date(text_stripped):
+            normalized_date = text_stripped.translate(_DATE_SEPARATORS)
+            standalone_dates.add(normalized_date)
 
         # --- Father's Name ---
-        if "father" in text_lower and not data["father_name"]:
-            value = re.sub(r"(?i)father'?s?\s+name\s*:?\s*", "", text_stripped).strip()
+        if "father" in tokens and not data["father_name"]:
+            value = _FATHER_LABEL_RE.sub("", text_stripped).strip()
             # Clean up OCR artifacts (single letters that should be part of names)
-            value = re.sub(r"\s+Or\s+", " ", value, flags=re.IGNORECASE)  # "Khali Or Rahman" -> "Khali Rahman"
+            value = _OR_CLEAN_RE.sub(" ", value)  # "Khali Or Rahman" -> "Khali Rahman"
             if value and not _is_label_only(value) and len(value) > 2:
                 data["father_name"] = value.title()
 
         # --- Name (comes after "Name" label, avoid header text) ---
-        if (re.search(r"(?i)^name\b", text_stripped) or re.search(r"(?i)name\s*:", text_stripped)) and not data["name"]:
-            value = re.sub(r"(?i)^name\s*:?\s*", "", text_stripped).strip()
+        if not data["name"] and (
+            _starts_with_name(text_lower)
+            or (":" in text_lower and _NAME_LABEL_COLON_RE.search(text_stripped))
+        ):
+            value = _NAME_LABEL_RE.sub("", text_stripped).strip()
             if value and not _is_label_only(value) and len(value) > 2:
                 data["name"] = value.title()
         
         # Collect potential name values (alphabetic text, 2+ words, reasonable length)
-        if (re.match(r"^[A-Za-z ]{5,50}$", text_stripped) and 
+        if (_NAME_CANDIDATE_RE.match(text_stripped) and 
             len(text_stripped.split()) >= 2 and
             not _is_label_only(text_stripped)):
             standalone_names.append(text_stripped)
 
+    # The loop itself cannot stop early: a later region may still overwrite
+    # identity_number or gender. The fill-in passes only touch missing fields,
+    # so they are skipped once every field is populated.
+
     # Second pass: try to extract from combined text for any missed fields
-    _extract_missing_from_combined(data, combined)
-    
+    if not all(data.values()):
+        _extract_missing_from_combined(data, " ".join(raw_texts))
+
     # Third pass: intelligent matching of standalone values using context
-    _match_standalone_values(data, raw_texts, standalone_dates, standalone_names)
+    if not all(data.values()):
+        _match_standalone_values(data, raw_texts, standalone_dates, standalone_names)
     
-    logger.info(f"Parsed data: {data}")
+    logger.info("Parsed data: %s", data)
     return CNICData(**data)
 
 
+def _scan_region(text_lower: str) -> dict[str, list[tuple[int, str]]]:
+    """
+    Tokenize a lowercased OCR region in a single regex pass.
+
+    Args:
+        text_lower: Lowercased, typo-normalized region text.
+
+    Returns:
+        Mapping of token kind (the named group) to its (position, text)
+        occurrences, in order of appearance.
+    """
+    tokens: dict[str, list[tuple[int, str]]] = {}
+    for match in _REGION_TOKEN_RE.finditer(text_lower):
+        # Every alternative is a named group, so lastgroup is always set
+        kind = match.lastgroup or ""
+        tokens.setdefault(kind, []).append((match.start(), match.group()))
+    return tokens
+
+
+def _fix_ocr_typos(text: str) -> str:
+    """Rewrite known OCR misreads of label keywords in a single pass."""
+    return _OCR_TYPO_RE.sub(lambda match: _OCR_TYPOS[match.group()], text)
+
+
+def _starts_with_name(text_lower: str) -> bool:
+    """Check if lowercased text starts with the word "name" (same as ^name\b)."""
+    if not text_lower.startswith("name"):
+        return False
+    # \w is exactly isalnum() plus the underscore
+    return len(text_lower) == 4 or not (text_lower[4].isalnum() or text_lower[4] == "_")
+
+
+def _is_standalone_date(text: str) -> bool:
+    """Check if stripped text is exactly one DD.MM.YYYY date (any of . / - separators)."""
+    # isdecimal() accepts the same characters as \d, unlike isdigit()
+    return (
+        len(text) == 10
+        and text[2] in "./-"
+        and text[5] in "./-"
+        and text[:2].isdecimal()
+        and text[3:5].isdecimal()
+        and text[6:].isdecimal()
+    )
+
+
 def _is_label_only(text: str) -> bool:
     """Check if text is just a label keyword with no actual value."""
-    labels = {
-        "pakistan", "national", "identity", "card", "islamic",
-        "republic", "holder", "signature", "holder's signature",
-        "name", "father", "fathers", "gender", "country", "date",
-        "birth", "issue", "expiry", "stay", "of", "the",
-    }
-    return text.strip().lower() in labels
+    text = text.strip()
+    # Lowercasing never shortens a string, so anything longer than the
+    # longest label can be rejected before allocating the lowered copy
+    if len(text) > _MAX_LABEL_LENGTH:
+        return False
+    return text.lower() in _LABELS
+
 
+def _extract_missing_from_combined(
+    data: dict[str, str | None],
+    combined: str,
+) -> None:
+    """
+    Try to fill missing fields from the combined text using regex.
 
-def _extract_missing_from_combined(data: dict, combined: str) -> None:
-    """Try to fill missing fields from the combined text using regex."""
+    Args:
+        data: Parsed fields, updated in place.
+        combined: All region texts joined with spaces.
+    """
 
     # Identity number
     if not data["identity_number"]:
-        match = re.search(r"\d{5}-\d{7}-\d", combined)
+        match = _CNIC_DASHED_RE.search(combined)
         if match:
             data["identity_number"] = match.group()
 
-    # Normalize OCR typos in combined text
-    combined = combined.replace("lssue", "issue").replace("Fathet", "Father").replace("fathet", "father")
+    # Normalize OCR typos in combined text. The fixes only change what the
+    # issue-date, name and father's-name patterns below can see.
+    if not data["name"] or not data["father_name"] or not data["date_of_issue"]:
+        combined = _fix_ocr_typos(combined)
+
+    # One scan for the keywords the date and father's-name patterns need;
+    # patterns whose keyword is absent cannot match and are skipped.
+    keywords = {match.lastgroup for match in _COMBINED_KEYWORD_RE.finditer(combined)}
     
     # Dates - more flexible patterns with typo tolerance
-    if not data["date_of_birth"]:
-        match = re.search(
-            r"(?i)(?:date\s+of\s+)?birth[^\d]*(\d{2}[./-]\d{2}[./-]\d{4})", combined
-        )
-        if match:
-            data["date_of_birth"] = match.group(1).replace("-", "/").replace(".", "/")
-
-    if not data["date_of_issue"]:
-        match = re.search(
-            r"(?i)(?:date\s+of\s+)?issue[^\d]*(\d{2}[./-]\d{2}[./-]\d{4})", combined
-        )
-        if match:
-            data["date_of_issue"] = match.group(1).replace("-", "/").replace(".", "/")
-
-    if not data["date_of_expiry"]:
-        match = re.search(
-            r"(?i)(?:date\s+of\s+)?expiry[^\d]*(\d{2}[./-]\d{2}[./-]\d{4})", combined
-        )
-        if match:
-            data["date_of_expiry"] = match.group(1).replace("-", "/").replace(".", "/")
+    for keyword, field, pattern in _DATE_FIELD_PATTERNS:
+        if not data[field] and keyword in keywords:
+            match = pattern.search(combined)
+            if match:
+                data[field] = match.group(1).translate(_DATE_SEPARATORS)
 
     # Name - use finditer to check context and avoid variable-width look-behind
     if not data["name"]:
-        for match in re.finditer(r"(?i)\bname\s+([A-Za-z ]+)", combined):
+        for match in _NAME_VALUE_RE.finditer(combined):
             # Check if this is not part of "father's name"
             start = match.start()
             prefix = combined[max(0, start - 15):start].lower()
@@ -238,28 +335,28 @@ def _extract_missing_from_combined(data: dict, combined: str) -> None:
                     break
 
     # Father's name - more flexible
-    if not data["father_name"]:
-        match = re.search(r"(?i)father'?s?\s+name\s*:?\s+([A-Za-z ]{3,50})", combined)
+    if not data["father_name"] and "father" in keywords:
+        match = _FATHER_VALUE_RE.search(combined)
         if match:
             value = match.group(1).strip()
             # Clean up potential trailing noise
-            value = re.split(r"\s+(?:gender|country|date|identity|holder)", value, flags=re.IGNORECASE)[0]
+            value = _TAIL_NOISE_RE.split(value)[0]
             # Clean up OCR artifacts
-            value = re.sub(r"\s+Or\s+", " ", value, flags=re.IGNORECASE)
+            value = _OR_CLEAN_RE.sub(" ", value)
             if not _is_label_only(value) and len(value) > 2:
                 data["father_name"] = value.title()
 
     # Gender
     if not data["gender"]:
-        match = re.search(r"(?i)gender\s+([MF])\b", combined)
+        match = _GENDER_COMBINED_RE.search(combined)
         if match:
             data["gender"] = "Male" if match.group(1).upper() == "M" else "Female"
 
 
 def _match_standalone_values(
-    data: dict, 
+    data: dict[str, str | None], 
     raw_texts: list[str], 
-    standalone_dates: list[str], 
+    standalone_dates: set[str], 
     standalone_names: list[str]
 ) -> None:
     """
@@ -267,47 +364,48 @@ def _match_standalone_values(
     
     This handles cases where OCR splits labels and values into separate regions.
     """
-    # Match dates to fields based on nearby label text
-    for i, text in enumerate(raw_texts):
-        text_lower = text.lower()
-        
+    stripped = tuple(text.strip() for text in raw_texts)
+    titled = tuple(text.title() for text in stripped)
+    standalone_titles = {name.title() for name in standalone_names}
+
+    # Classify every region once; each label then only checks flags in its window
+    is_date = [text in standalone_dates for text in stripped]
+    is_name = [text in standalone_titles for text in titled]
+    region_lower = [text.lower() for text in raw_texts]
+    region_keywords = [set(_CONTEXT_KEYWORD_RE.findall(text)) for text in region_lower]
+
+    for i, text_lower in enumerate(region_lower):
+        keywords = region_keywords[i]
+
         # Look for date labels and check next few regions for standalone dates
-        if "birth" in text_lower and not data["date_of_birth"]:
-            for j in range(max(0, i-2), min(len(raw_texts), i+3)):
-                if raw_texts[j].strip() in standalone_dates:
-                    data["date_of_birth"] = raw_texts[j].strip()
-                    logger.info(f"Matched date of birth from context: {data['date_of_birth']}")
-                    break
-        
-        if "issue" in text_lower and not data["date_of_issue"]:
-            for j in range(max(0, i-2), min(len(raw_texts), i+3)):
-                if raw_texts[j].strip() in standalone_dates:
-                    data["date_of_issue"] = raw_texts[j].strip()
-                    logger.info(f"Matched date of issue from context: {data['date_of_issue']}")
-                    break
-        
-        if "expiry" in text_lower and not data["date_of_expiry"]:
-            for j in range(max(0, i-2), min(len(raw_texts), i+3)):
-                if raw_texts[j].strip() in standalone_dates:
-                    data["date_of_expiry"] = raw_texts[j].strip()
-                    logger.info(f"Matched date of expiry from context: {data['date_of_expiry']}")
-                    break
-        
+        for keyword, field, label in _CONTEXT_DATE_FIELDS:
+            if keyword in keywords and not data[field]:
+                j = _first_in_window(is_date, i)
+                if j is not None:
+                    data[field] = stripped[j]
+                    logger.info("Matched %s from context: %s", label, data[field])
+
         # Match names based on context
-        if "father" in text_lower and not data["father_name"]:
-            for j in range(max(0, i-2), min(len(raw_texts), i+3)):
-                if raw_texts[j].strip().title() in [n.title() for n in standalone_names]:
-                    data["father_name"] = raw_texts[j].strip().title()
-                    logger.info(f"Matched father's name from context: {data['father_name']}")
-                    break
-        
+        if "father" in keywords and not data["father_name"]:
+            j = _first_in_window(is_name, i)
+            if j is not None:
+                data["father_name"] = titled[j]
+                logger.info("Matched father's name from context: %s", data["father_name"])
+
         # Match person's name - should be near beginning, not near "father"
-        if (re.search(r"(?i)^name\b", text_lower) or "name" == text_lower.strip()) and not data["name"]:
+        if not data["name"] and (_starts_with_name(text_lower) or text_lower.strip() == "name"):
             # Avoid matching near father's name label
-            context_lower = " ".join(raw_texts[max(0, i-2):min(len(raw_texts), i+3)]).lower()
-            if "father" not in context_lower:
-                for j in range(max(0, i-2), min(len(raw_texts), i+3)):
-                    if raw_texts[j].strip().title() in [n.title() for n in standalone_names]:
-                        data["name"] = raw_texts[j].strip().title()
-                        logger.info(f"Matched name from context: {data['name']}")
-                        break
+            window = range(max(0, i - 2), min(len(raw_texts), i + 3))
+            if not any("father" in region_keywords[j] for j in window):
+                j = _first_in_window(is_name, i)
+                if j is not None:
+                    data["name"] = titled[j]
+                    logger.info("Matched name from context: %s", data["name"])
+
+
+def _first_in_window(flags: list[bool], i: int) -> int | None:
+    """Return the first index within two regions of i whose flag is set."""
+    for j in range(max(0, i - 2), min(len(flags), i + 3)):
+        if flags[j]:
+            return j
+    return None
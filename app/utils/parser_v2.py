@@ -3,61 +3,113 @@ Improved CNIC parser with robust error handling for OCR mistakes.
 Extracts 8 key fields with validation: name, father_name, gender, country_of_stay,
 identity_number, date_of_birth, date_of_issue, date_of_expiry.
 """
+import functools
 import logging
 import re
 from typing import Optional, Tuple
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Distinct OCR region lists whose parse results are kept (retries and
+# duplicate uploads produce the same texts)
+_PARSE_CACHE_SIZE = 512
+
+_ID_RE = re.compile(r"\b(\d{5}[-\s]?\d{7}[-\s]?\d)\b")
+_DATE_RE = re.compile(r"\b(\d{2}[./-]\d{2}[./-]\d{4})\b")
+_DATE_SEP_TRANS = str.maketrans({".": "/", "-": "/"})
+_VALID_DATE_RE = re.compile(r"(\d{2})/(\d{2})/(\d{4})")
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+_DATE_KW_RE = re.compile(r"birth|issue|expiry")
+_KEYWORD_PRIORITY_RE = re.compile(r"identity|birth|issue|expiry|gender|country|father|name", re.IGNORECASE)
+_DATE_KEYWORD_FIELDS = {
+    "birth": "date_of_birth",
+    "issue": "date_of_issue",
+    "expiry": "date_of_expiry",
+}
+_MF_RE = re.compile(r"\b([MF])\b", re.IGNORECASE)
+_MF_STANDALONE_RE = re.compile(r"^\s*[MF]\s*$", re.IGNORECASE)
+_FATHER_STRIP_RE = re.compile(r"father'?s?\s+name\s*:?\s*", re.IGNORECASE)
+_NAME_STRIP_RE = re.compile(r"^name\s*:?\s*", re.IGNORECASE)
+_NOISE_RE = re.compile(r"\b(pakistan|national|identity|card|islamic|republic)\b", re.IGNORECASE)
+_COUNTRY_OF_STAY_RE = re.compile(r"country\s*of\s*stay\s*:?\s*", re.IGNORECASE)
+_COUNTRY_RE = re.compile(r"country\s*:?\s*", re.IGNORECASE)
+# Label keywords that disqualify a region as a standalone name (matched lowercased)
+_STANDALONE_EXCLUDE_RE = re.compile(r"father|name|gender|date|identity|birth|issue|expiry|country")
+
+# Words to ignore when cleaning extracted values
+_IGNORE_WORDS = frozenset({
+    "pakistan", "national", "identity", "card", "islamic",
+    "republic", "holder", "signature", "holders", "no", "text",
+    "detected", "of", "the", "date", "name", "father", "gender",
+    "country", "stay", "birth", "issue", "expiry", "number"
+})
+
+# Header lines that carry no field value on their own
+_NOISE_PHRASES = frozenset({
+    "pakistan national identity card",
+    "islamic republic of pakistan",
+    "holder's signature",
+    "holder signature",
+    "national identity card",
+    "national identity"
+})
+
+# Valid countries for CNIC
+_VALID_COUNTRIES = frozenset({
+    "pakistan", "afghanistan", "india", "iran", "china", "saudi arabia",
+    "united arab emirates", "uae", "united kingdom", "uk", "united states",
+    "usa", "canada", "australia", "turkey", "malaysia", "indonesia"
+})
+
+
+def _is_ascii_words(text: str) -> bool:
+    """Check if text is only ASCII letters and spaces, with at least one letter."""
+    return text.isascii() and text.replace(" ", "").isalpha()
+
 
 class CNICParser:
     """Parse raw OCR texts into structured CNIC fields with error correction."""
     
     def __init__(self):
-        # Common OCR typos and corrections
-        self.typo_corrections = {
-            "gende": "gender",
-            "gendei": "gender",
-            "gendet": "gender",
-            "fathet": "father",
-            "lssue": "issue",
-            "birt": "birth",
-            "expir": "expiry",
-            "countryofstay": "country of stay",
-            "country ofstay": "country of stay",
-            "countryof stay": "country of stay",
-        }
-        
-        # Words to ignore when cleaning extracted values
-        self.ignore_words = {
-            "pakistan", "national", "identity", "card", "islamic",
-            "republic", "holder", "signature", "holders", "no", "text",
-            "detected", "of", "the", "date", "name", "father", "gender",
-            "country", "stay", "birth", "issue", "expiry", "number"
-        }
-        
-        # Valid countries for CNIC
-        self.valid_countries = {
-            "pakistan", "afghanistan", "india", "iran", "china", "saudi arabia",
-            "united arab emirates", "uae", "united kingdom", "uk", "united states",
-            "usa", "canada", "australia", "turkey", "malaysia", "indonesia"
-        }
+        # Per-instance memo of parse results, keyed by the tuple of raw texts
+        self._parse_cached = functools.lru_cache(maxsize=_PARSE_CACHE_SIZE)(self._parse)
     
     def parse(self, raw_texts: list[str]) -> Tuple[dict[str, Optional[str]], Optional[str]]:
         """
         Parse raw OCR texts into structured CNIC fields.
         
+        Results are memoized per distinct list of texts; callers get their
+        own copy of the field dict.
+        
         Args:
             raw_texts: List of OCR text strings from detected regions
             
         Returns:
             Tuple of (dict with 8 CNIC fields, error_message or None)
         """
+        result, error = self._parse_cached(tuple(raw_texts))
+        return dict(result), error
+    
+    def parse_many(
+        self, batches: list[list[str]]
+    ) -> list[Tuple[dict[str, Optional[str]], Optional[str]]]:
+        """
+        Parse several cards' OCR texts with the same parser state.
+        
+        Args:
+            batches: One list of OCR text strings per card
+            
+        Returns:
+            (fields dict, error_message or None) tuples, in input order
+        """
+        return [self.parse(raw_texts) for raw_texts in batches]
+    
+    def _parse(self, raw_texts: tuple[str, ...]) -> Tuple[dict[str, Optional[str]], Optional[str]]:
+        """Uncached implementation of parse()."""
         logger.info(f"Parsing {len(raw_texts)} OCR regions")
         
         # Initialize result
-        result = {
+        result: dict[str, Optional[str]] = {
             "name": None,
             "father_name": None,
             "gender": None,
@@ -76,6 +128,10 @@ class CNICParser:
         
         logger.debug(f"Cleaned texts: {filtered_texts}")
         
+        # Visit labeled lines first so the loop below can stop early; the sort
+        # is stable, so unlabeled lines keep their order for the standalone pass
+        filtered_texts.sort(key=lambda t: 0 if _KEYWORD_PRIORITY_RE.search(t) else 1)
+        
         # First pass: Extract labeled fields (these take priority)
         for text in filtered_texts:
             text_lower = text.lower()
@@ -85,15 +141,15 @@ class CNICParser:
                 result["identity_number"] = self._extract_identity_number(text)
             
             # Dates (birth, issue, expiry)
-            self._extract_dates(text, result)
+            self._extract_dates(text, text_lower, result)
             
             # Gender - prioritize extracting from labeled lines
             if not result["gender"]:
-                result["gender"] = self._extract_gender(text)
+                result["gender"] = self._extract_gender(text, text_lower)
             
             # Country of Stay
             if not result["country_of_stay"]:
-                result["country_of_stay"] = self._extract_country(text)
+                result["country_of_stay"] = self._extract_country(text, text_lower)
             
             # Name - ONLY if "name" keyword is present
             if not result["name"] and "name" in text_lower:
@@ -102,15 +158,16 @@ class CNICParser:
             # Father's Name - ONLY if "father" keyword is present
             if not result["father_name"] and "father" in text_lower:
                 result["father_name"] = self._extract_name(text, is_father=True)
+            
+            # Every extractor only fills empty fields, so nothing is left to do
+            if all(result.values()):
+                break
         
         # Second pass: standalone name extraction
         # If we still don't have name/father name, look for standalone names
         if not result["name"] or not result["father_name"]:
             self._extract_standalone_names(filtered_texts, result)
         
-        # Clean and validate final result
-        result = self._clean_result(result)
-        
         # Validate critical fields
         validation_error = self._validate_result(result)
         if validation_error:
@@ -121,18 +178,8 @@ class CNICParser:
         return result, None
     
     def _normalize_text(self, text: str) -> str:
-        """Normalize text by fixing common OCR typos."""
-        text = text.strip()
-        text_lower = text.lower()
-        
-        # Apply typo corrections
-        for typo, correction in self.typo_corrections.items():
-            text_lower = text_lower.replace(typo, correction)
-        
-        # Remove extra spaces
-        text = " ".join(text.split())
-        
-        return text
+        """Normalize text by trimming it and collapsing runs of whitespace."""
+        return " ".join(text.split())
     
     def _is_meaningful(self, text: str) -> bool:
         """Check if text contains meaningful data (not just headers/noise)."""
@@ -147,16 +194,7 @@ class CNICParser:
             return False
         
         # Skip pure header text
-        noise_phrases = [
-            "pakistan national identity card",
-            "islamic republic of pakistan",
-            "holder's signature",
-            "holder signature",
-            "national identity card",
-            "national identity"
-        ]
-        
-        if any(phrase == text_lower for phrase in noise_phrases):
+        if text_lower in _NOISE_PHRASES:
             return False
         
         return True
@@ -164,7 +202,7 @@ class CNICParser:
     def _extract_identity_number(self, text: str) -> Optional[str]:
         """Extract CNIC identity number."""
         # Format: XXXXX-XXXXXXX-X
-        match = re.search(r"\b(\d{5}[-\s]?\d{7}[-\s]?\d)\b", text)
+        match = _ID_RE.search(text)
         if match:
             # Normalize format with dashes
             raw = match.group(1).replace(" ", "").replace("-", "")
@@ -172,91 +210,72 @@ class CNICParser:
                 return f"{raw[:5]}-{raw[5:12]}-{raw[12]}"
         return None
     
-    def _extract_dates(self, text: str, result: dict) -> None:
+    def _extract_dates(self, text: str, text_lower: str, result: dict[str, Optional[str]]) -> None:
         """Extract dates from text into result dict."""
-        text_lower = text.lower()
-        
-        # Find all dates in format DD.MM.YYYY or DD/MM/YYYY or DD-MM-YYYY
-        date_pattern = r"\b(\d{2}[./-]\d{2}[./-]\d{4})\b"
-        dates = re.findall(date_pattern, text)
-        
-        if not dates:
-            return
-        
-        # Normalize dates to DD/MM/YYYY
-        dates = [d.replace(".", "/").replace("-", "/") for d in dates]
-        
-        # If text contains keywords, use position-based matching
-        keywords = {
-            "birth": "date_of_birth",
-            "issue": "date_of_issue",
-            "expiry": "date_of_expiry",
-        }
-        
-        # Map keywords to their position in text
-        keyword_positions = []
-        for keyword, field_name in keywords.items():
-            if keyword in text_lower and not result[field_name]:
-                pos = text_lower.find(keyword)
-                keyword_positions.append((pos, field_name))
-        
-        # Sort by position
-        keyword_positions.sort()
+        # Find all dates in format DD.MM.YYYY, DD/MM/YYYY or DD-MM-YYYY with
+        # their offsets, normalized to DD/MM/YYYY
+        date_positions = [
+            (match.start(), match.group(1).translate(_DATE_SEP_TRANS))
+            for match in _DATE_RE.finditer(text)
+        ]
         
-        # Match each keyword with the nearest following date
-        date_positions = [(text.lower().find(d.replace("/", ".")), d) for d in dates if text.lower().find(d.replace("/", ".")) >= 0]
         if not date_positions:
-            date_positions = [(text.lower().find(d.replace("/", "-")), d) for d in dates if text.lower().find(d.replace("/", "-")) >= 0]
-        if not date_positions:
-            date_positions = [(text.lower().find(d), d) for d in dates if text.lower().find(d) >= 0]
+            return
         
-        date_positions.sort()
+        # Position of the first occurrence of each keyword whose field is still empty
+        keyword_positions = {}
+        for match in _DATE_KW_RE.finditer(text_lower):
+            field_name = _DATE_KEYWORD_FIELDS[match.group()]
+            if field_name not in keyword_positions and not result[field_name]:
+                keyword_positions[field_name] = match.start()
         
-        used_dates = set()
-        for kw_pos, field_name in keyword_positions:
-            # Find first date after this keyword
+        # Match each keyword, in order of appearance, with the nearest following date
+        used_positions = set()
+        for field_name, kw_pos in sorted(keyword_positions.items(), key=lambda item: item[1]):
             for date_pos, date_val in date_positions:
-                if date_pos > kw_pos and date_val not in used_dates:
+                if date_pos > kw_pos and date_pos not in used_positions:
                     result[field_name] = date_val
-                    used_dates.add(date_val)
+                    used_positions.add(date_pos)
                     logger.debug(f"Extracted {field_name}: {date_val}")
                     break
     
-    def _extract_gender(self, text: str) -> Optional[str]:
+    def _extract_gender(self, text: str, text_lower: str) -> Optional[str]:
         """Extract gender from text."""
-        text_lower = text.lower()
-        
-        # Look for "gender" keyword or variations (gende, gendei, gendet)
-        if any(kw in text_lower for kw in ["gender", "gende"]):
+        # Look for "gender" keyword or variations (gende, gendei, gendet);
+        # "gende" is a prefix of all of them, so one scan covers every spelling
+        if "gende" in text_lower:
             # Find M or F anywhere in the text
-            match = re.search(r"\b([MF])\b", text, re.IGNORECASE)
+            match = _MF_RE.search(text)
             if match:
                 return "Male" if match.group(1).upper() == "M" else "Female"
         
         # Standalone M or F
-        if re.match(r"^\s*[MF]\s*$", text, re.IGNORECASE):
+        if _MF_STANDALONE_RE.match(text):
             return "Male" if text.strip().upper() == "M" else "Female"
         
         return None
     
     def _extract_name(self, text: str, is_father: bool = False) -> Optional[str]:
         """Extract name or father's name from text."""
-        text_lower = text.lower()
-        
         if is_father:
             # Remove "father" keyword and clean
-            text = re.sub(r"(?i)father'?s?\s+name\s*:?\s*", "", text)
+            text = _FATHER_STRIP_RE.sub("", text)
         else:
             # Remove "name" keyword and clean
-            text = re.sub(r"(?i)^name\s*:?\s*", "", text)
+            text = _NAME_STRIP_RE.sub("", text)
         
         text = text.strip()
         
+        # Removing the ASCII header words below cannot fix a digit or
+        # punctuation mark, so such ASCII text is rejected before the sub
+        if text.isascii() and not "".join(text.split()).isalpha():
+            return None
+        
         # Clean unwanted text
-        text = re.sub(r"(?i)\b(pakistan|national|identity|card|islamic|republic)\b", "", text).strip()
+        text = _NOISE_RE.sub("", text).strip()
         
         # Must be alphabetic with possible spaces and be reasonable length
-        if re.match(r"^[A-Za-z ]{3,50}$", text) and len(text.split()) >= 2:
+        if 3 <= len(text) <= 50 and _is_ascii_words(text) and len(text.split()) >= 2:
             return text.title()
         
         return None
@@ -264,13 +283,14 @@ class CNICParser:
     def _looks_like_name(self, text: str) -> bool:
         """Check if text looks like a person's name."""
         # 2-4 words, alphabetic, reasonable length
+        if not 5 <= len(text) <= 40:
+            return False
         words = text.split()
-        if 2 <= len(words) <= 4:
-            if all(w.isalpha() for w in words) and 5 <= len(text) <= 40:
-                return True
-        return False
+        # Words are non-empty, so one isalpha() over the concatenation
+        # is equivalent to checking each word
+        return 2 <= len(words) <= 4 and "".join(words).isalpha()
     
-    def _extract_standalone_names(self, texts: list[str], result: dict) -> None:
+    def _extract_standalone_names(self, texts: list[str], result: dict[str, Optional[str]]) -> None:
         """Extract names from standalone text lines as fallback only."""
         potential_names = []
         
@@ -278,7 +298,7 @@ class CNICParser:
             text_clean = text.strip()
             
             # Skip if already has a keyword
-            if any(kw in text.lower() for kw in ["father", "name", "gender", "date", "identity", "birth", "issue", "expiry", "country"]):
+            if _STANDALONE_EXCLUDE_RE.search(text.lower()):
                 continue
             
             # Check if looks like a name
@@ -295,16 +315,14 @@ class CNICParser:
             result["name"] = potential_names[1]
             logger.debug(f"Extracted name from standalone (fallback): {result['name']}")
     
-    def _extract_country(self, text: str) -> Optional[str]:
+    def _extract_country(self, text: str, text_lower: str) -> Optional[str]:
         """Extract country of stay from text."""
-        text_lower = text.lower()
-        
         # Look for "country" keyword variations
         if "country" in text_lower:
             # Remove the keyword and extract country name
             # Handle variations: "Country of Stay", "Country ofStay", "countryofstay"
-            cleaned = re.sub(r"(?i)country\s*of\s*stay\s*:?\s*", "", text).strip()
-            cleaned = re.sub(r"(?i)country\s*:?\s*", "", cleaned).strip()
+            cleaned = _COUNTRY_OF_STAY_RE.sub("", text).strip()
+            cleaned = _COUNTRY_RE.sub("", cleaned).strip()
             
             # Check if we have a valid country name
             if cleaned and len(cleaned) > 2 and cleaned.replace(" ", "").isalpha():
@@ -312,16 +330,7 @@ class CNICParser:
         
         return None
     
-    def _clean_result(self, result: dict) -> dict:
-        """Clean and validate final result."""
-        # Remove leading/trailing spaces
-        for key in result:
-            if result[key] and isinstance(result[key], str):
-                result[key] = result[key].strip()
-        
-        return result
-    
-    def _validate_result(self, result: dict) -> Optional[str]:
+    def _validate_result(self, result: dict[str, Optional[str]]) -> Optional[str]:
         """Validate extracted data quality. Returns error message if validation fails."""
         
         # Check if any critical field is missing
@@ -332,51 +341,52 @@ class CNICParser:
         
         missing_fields = []
         for field in required_fields:
-            if not result[field] or result[field].strip() == "":
+            value = result[field]
+            if not value or value.strip() == "":
                 missing_fields.append(field.replace('_', ' ').title())
         
         if missing_fields:
             fields_str = ", ".join(missing_fields)
             return f"Image quality is poor. Could not detect: {fields_str}. Please provide a clearer image."
         
+        # Every field is a non-empty string from here on; "or" only narrows the type
+        
         # Validate dates (must be complete and valid)
         date_fields = ['date_of_birth', 'date_of_issue', 'date_of_expiry']
         for field in date_fields:
-            if not self._is_valid_date(result[field]):
+            if not self._is_valid_date(result[field] or ""):
                 return f"Image quality is poor. {field.replace('_', ' ').title()} is incomplete or invalid. Please provide a clearer image."
         
         # Validate country (must be a real country name)
-        if not self._is_valid_country(result['country_of_stay']):
+        if not self._is_valid_country(result['country_of_stay'] or ""):
             return f"Image quality is poor. Country '{result['country_of_stay']}' appears invalid. Please provide a clearer image."
         
         return None
     
     def _is_valid_date(self, date_str: str) -> bool:
         """Check if date string is valid and complete."""
-        try:
-            # Try to parse DD/MM/YYYY format
-            date_obj = datetime.strptime(date_str, "%d/%m/%Y")
-            
-            # Check reasonable year range (1900-2100)
-            if date_obj.year < 1900 or date_obj.year > 2100:
-                return False
-            
-            # Check month and day are valid
-            if date_obj.month < 1 or date_obj.month > 12:
-                return False
-            if date_obj.day < 1 or date_obj.day > 31:
-                return False
-            
-            return True
-        except (ValueError, AttributeError):
+        # Dates are normalized to DD/MM/YYYY by _extract_dates
+        match = _VALID_DATE_RE.fullmatch(date_str)
+        if not match:
+            return False
+        
+        day, month, year = int(match[1]), int(match[2]), int(match[3])
+        
+        # Check reasonable year range (1900-2100) and month/day bounds
+        if not (1900 <= year <= 2100 and 1 <= month <= 12 and 1 <= day <= 31):
             return False
+        
+        # Reject days past the end of the month (e.g. 31/04, 29/02 off leap years)
+        if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+            return day <= 29
+        return day <= _DAYS_IN_MONTH[month - 1]
     
     def _is_valid_country(self, country: str) -> bool:
         """Check if country name is valid."""
         country_lower = country.lower().strip()
         
         # Check against known countries
-        if country_lower in self.valid_countries:
+        if country_lower in _VALID_COUNTRIES:
             return True
         
         # If not in list, check if it at least looks like a country name
@@ -384,13 +394,15 @@ class CNICParser:
         if len(country_lower) < 3 or len(country_lower) > 30:
             return False
         
-        # Should be mostly alphabetic
-        alpha_ratio = sum(c.isalpha() or c.isspace() for c in country_lower) / len(country_lower)
-        if alpha_ratio < 0.8:
-            return False
+        # Should be mostly alphabetic. _extract_country only yields letters and
+        # spaces, so the per-character count is just a fallback.
+        if not country_lower.replace(" ", "").isalpha():
+            alpha_ratio = sum(c.isalpha() or c.isspace() for c in country_lower) / len(country_lower)
+            if alpha_ratio < 0.8:
+                return False
         
         # Check it's not OCR garbage (like "M" or "Gende")
-        if country_lower in self.ignore_words:
+        if country_lower in _IGNORE_WORDS:
             return False
         
         # Accept if it passes basic checks
@@ -14,4 +14,8 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        workers=settings.WORKERS,
+        backlog=settings.BACKLOG,
+        limit_concurrency=settings.LIMIT_CONCURRENCY,
+        timeout_keep_alive=settings.KEEP_ALIVE_TIMEOUT,
     )